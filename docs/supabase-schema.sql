@@ -118,6 +118,45 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Upsert a batch of items and their stock levels in one transaction
+-- (used by tally_sync.py when sync.use_upsert_rpc is enabled)
+CREATE OR REPLACE FUNCTION upsert_items_and_stock(payload JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    synced_count INTEGER;
+BEGIN
+    WITH upserted AS (
+        INSERT INTO items (item_code, item_name, category, unit, updated_at)
+        SELECT p.item_code, p.item_name, p.category, p.unit, p.updated_at
+        FROM jsonb_to_recordset(payload) AS p(
+            item_code VARCHAR, item_name VARCHAR, category VARCHAR, unit VARCHAR, updated_at TIMESTAMPTZ
+        )
+        ON CONFLICT (item_code) DO UPDATE SET
+            item_name = EXCLUDED.item_name,
+            category = EXCLUDED.category,
+            unit = EXCLUDED.unit,
+            updated_at = EXCLUDED.updated_at
+        RETURNING id, item_code
+    )
+    INSERT INTO stock_levels (item_id, current_stock, physical_baseline, tally_delta, last_sync, sync_source)
+    SELECT u.id, p.current_stock, p.physical_baseline, p.tally_delta, p.last_sync, p.sync_source
+    FROM jsonb_to_recordset(payload) AS p(
+        item_code VARCHAR, current_stock DECIMAL, physical_baseline DECIMAL, tally_delta DECIMAL,
+        last_sync TIMESTAMPTZ, sync_source VARCHAR
+    )
+    JOIN upserted u ON u.item_code = p.item_code
+    ON CONFLICT (item_id) DO UPDATE SET
+        current_stock = EXCLUDED.current_stock,
+        physical_baseline = EXCLUDED.physical_baseline,
+        tally_delta = EXCLUDED.tally_delta,
+        last_sync = EXCLUDED.last_sync,
+        sync_source = EXCLUDED.sync_source;
+    
+    GET DIAGNOSTICS synced_count = ROW_COUNT;
+    RETURN synced_count;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Sample data for testing (remove in production)
 INSERT INTO items (item_code, item_name, category, unit) VALUES
     ('BRAKE001', 'Brake Pads Front', 'Brakes', 'Set'),
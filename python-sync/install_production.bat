@@ -49,9 +49,11 @@ echo Step 5: Installing dependencies...
 echo supabase==2.28.0 > requirements.txt
 echo requests==2.31.0 >> requirements.txt
 echo pandas==2.1.4 >> requirements.txt
-echo schedule==1.2.0 >> requirements.txt
+echo APScheduler==3.10.4 >> requirements.txt
+echo filelock==3.13.1 >> requirements.txt
 echo python-dotenv==1.0.0 >> requirements.txt
 echo pyodbc==5.0.1 >> requirements.txt
+echo orjson==3.9.10 >> requirements.txt
 echo websockets^>=11,^<16 >> requirements.txt
 echo realtime^>=1.0.6,^<2.0.0 >> requirements.txt
 echo postgrest^>=0.10.8,^<1.0.0 >> requirements.txt
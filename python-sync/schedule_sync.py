@@ -4,51 +4,137 @@ Scheduler script for TallyPrime Clean Slate sync operations.
 This script can be used to run the sync at regular intervals.
 """
 
-import schedule
-import time
+import atexit
 import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from filelock import FileLock, Timeout
 from tally_sync import TallySyncManager
 
-def run_scheduled_sync():
+# Daily sync time, parsed once; the scheduler derives each next fire time from it
+SYNC_TRIGGER = CronTrigger(hour=12, minute=0)
+
+# Cross-process guard so a restarted scheduler cannot overlap a sync still in progress
+SYNC_LOCK_FILE = os.path.join(tempfile.gettempdir(), 'tally-sync.lock')
+
+# Syncs run on a dedicated worker so the scheduler thread returns immediately
+_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tally-sync')
+_sync_future: Optional[Future] = None
+_submit_lock = threading.Lock()
+
+# Set up by setup_logging(); records are batched in memory and written out after each run
+_log_queue: Optional[queue.Queue] = None
+_file_log_buffer: Optional[MemoryHandler] = None
+
+def _flush_log_file():
+    """Write buffered log records to scheduler.log once the queued records have been handled"""
+    if _file_log_buffer is None:
+        return
+    _log_queue.join()  # QueueListener marks each record done after passing it to the handlers
+    _file_log_buffer.flush()
+
+def _do_sync(sync_manager: TallySyncManager):
     """Run the sync operation with error handling"""
     try:
-        logging.info("Starting scheduled sync operation")
-        sync_manager = TallySyncManager()
-        success = sync_manager.run_sync()
+        with FileLock(SYNC_LOCK_FILE, timeout=0):
+            logging.info("Starting scheduled sync operation")
+            success = sync_manager.run_sync()
         
         if success:
             logging.info("Scheduled sync completed successfully")
         else:
             logging.error("Scheduled sync failed")
             
-    except Exception as e:
-        logging.error(f"Scheduled sync error: {e}")
+    except Timeout:
+        logging.warning("Previous sync still running in another process, skipping this run")
+    except Exception:
+        logging.exception("Scheduled sync error")
+    finally:
+        _flush_log_file()
+
+def run_scheduled_sync(sync_manager: TallySyncManager):
+    """Submit a sync to the worker, skipping it if the previous one is still running"""
+    global _sync_future
+    
+    with _submit_lock:
+        if _sync_future is not None and not _sync_future.done():
+            logging.warning("Previous sync still running, skipping this run")
+            _flush_log_file()
+            return
+        _sync_future = _sync_executor.submit(_do_sync, sync_manager)
+
+def setup_logging() -> QueueListener:
+    """Route log records through a queue so file/console writes happen off the sync thread"""
+    global _log_queue, _file_log_buffer
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = RotatingFileHandler('scheduler.log', maxBytes=10 * 1024 * 1024, backupCount=5, delay=True)
+    file_handler.setFormatter(formatter)
+    
+    # Buffer file writes within a run; errors, a full buffer and the end of each run flush them
+    _file_log_buffer = MemoryHandler(512, flushLevel=logging.ERROR, target=file_handler)
+    atexit.register(_file_log_buffer.close)  # close() flushes pending records first
+    handlers = [_file_log_buffer]
+    
+    # Only echo to the console when running interactively, not as a background service
+    if sys.stderr is not None and sys.stderr.isatty():
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+    
+    _log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(_log_queue))
+    
+    listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
 
 def main():
     """Main scheduler loop"""
     # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('scheduler.log'),
-            logging.StreamHandler()
-        ]
-    )
+    log_listener = setup_logging()
     
-    # Schedule sync to run daily at 2 AM
-    schedule.every().day.at("12:00").do(run_scheduled_sync)
+    # Build the sync manager once so config and clients are reused across runs
+    sync_manager = TallySyncManager()
+    
+    scheduler = BlockingScheduler()
+    
+    # Schedule sync to run daily at 12:00. A fire missed by up to 6 hours (sleep/suspend)
+    # still runs, and several missed fires collapse into a single catch-up run.
+    scheduler.add_job(
+        run_scheduled_sync,
+        SYNC_TRIGGER,
+        args=[sync_manager],
+        misfire_grace_time=6 * 3600,
+        coalesce=True,
+        max_instances=1
+    )
     
     # Alternative: Run every 6 hours
-    # schedule.every(6).hours.do(run_scheduled_sync)
+    # scheduler.add_job(run_scheduled_sync, 'interval', hours=6, args=[sync_manager])
     
     logging.info("TallyPrime sync scheduler started")
-    logging.info("Next sync scheduled for: 12:00 daily")
+    logging.info("Next sync scheduled for: %s", "12:00 daily")
+    _flush_log_file()
     
-    # Keep the scheduler running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    # Blocks until the next fire time; no polling loop needed
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        logging.info("TallyPrime sync scheduler stopped")
+    finally:
+        _sync_executor.shutdown(wait=True)
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
@@ -7,56 +7,265 @@ levels using physical baselines and Tally deltas, then pushes the truth to Supab
 Uses JSON for all data handling - much simpler than XML parsing.
 """
 
+import asyncio
 import json
 import logging
-import csv
+import hashlib
+import os
+import shelve
 import sys
+import threading
+import httpx
 import pyodbc
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON exports when installed
+    orjson = None
+
+try:
+    import turbodbc
+except ImportError:  # Optional: columnar NumPy fetches when installed
+    turbodbc = None
+
+# Errors raised by whichever ODBC backends are available
+ODBC_ERRORS = (pyodbc.Error, turbodbc.Error) if turbodbc is not None else (pyodbc.Error,)
+
+# Open ODBC connections shared process-wide, keyed by DSN
+_CONNECTION_POOL: Dict[str, Any] = {}
+_CONNECTION_POOL_LOCK = threading.Lock()
+
+# Rows pulled from the ODBC driver per fetch; larger blocks mean fewer driver round trips
+ODBC_FETCH_SIZE = 10000
+
+# Combined STOCKITEM query; its result is cached per connection (see _fetch_stockitem_data)
+# Note: Column names may vary by TallyPrime version - adjust as needed
+STOCKITEM_QUERY = """
+    SELECT 
+        $Name AS STOCKITEMNAME, 
+        $Parent AS PARENT, 
+        $BaseUnits AS BASEUNITS, 
+        $ClosingBalance AS CLOSINGBALANCE, 
+        $OpeningBalance AS OPENINGBALANCE, 
+        $ClosingValue AS CLOSINGVALUE, 
+        $ClosingRate AS CLOSINGRATE
+    FROM STOCKITEM
+    WHERE $Name IS NOT NULL
+"""
+
+# Minimal query used to health-check pooled connections
+PING_QUERY = "SELECT $Name FROM Company"
+
+# File buffer for JSON exports; records are flushed to disk in blocks of this size
+JSON_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def _dumps_json(value: Any) -> bytes:
+    """Serialize one value to compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _write_json_file(filename: str, data: Dict):
+    """
+    Stream a dict to a UTF-8 JSON file one top-level value at a time
+    
+    List values are written element by element, one record per line, so the
+    serialized export is never held in memory as a single string.
+    
+    Args:
+        filename: Output JSON filename
+        data: Export payload with JSON-compatible values
+    """
+    with open(filename, 'wb', buffering=JSON_WRITE_BUFFER_SIZE) as f:
+        f.write(b'{')
+        for index, (key, value) in enumerate(data.items()):
+            f.write(b',\n  ' if index else b'\n  ')
+            f.write(_dumps_json(key) + b': ')
+            
+            if isinstance(value, list):
+                f.write(b'[')
+                for element_index, element in enumerate(value):
+                    f.write(b',\n    ' if element_index else b'\n    ')
+                    f.write(_dumps_json(element))
+                f.write(b'\n  ]' if value else b']')
+            else:
+                f.write(_dumps_json(value))
+        f.write(b'\n}\n')
+
+
+def _read_json_file(filename: str) -> Any:
+    """Read a JSON file, using orjson when available"""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch either
+    with open(filename, 'rb') as f:
+        data_bytes = f.read()
+    
+    return orjson.loads(data_bytes) if orjson is not None else json.loads(data_bytes)
+
+
+def _iter_rows(cursor):
+    """Yield rows from an executed cursor, fetching ODBC_FETCH_SIZE rows at a time"""
+    for rows in iter(lambda: cursor.fetchmany(ODBC_FETCH_SIZE), []):
+        yield from rows
+
+
+def _unmask_column(column, fill_value):
+    """Replace masked (NULL) entries of a turbodbc column with fill_value, which may be None"""
+    if not hasattr(column, 'filled'):
+        return column
+    if fill_value is not None:
+        return column.filled(fill_value)
+    
+    values = column.data.astype(object)
+    values[np.ma.getmaskarray(column)] = None
+    return values
+
 
 class TallyODBCAPI:
     """ODBC-based interface for TallyPrime data extraction"""
     
-    def __init__(self, dsn_name: str = "TallyODBC64_9000", timeout: int = 60, company_name: str = "Default"):
+    def __init__(self, dsn_name: str = "TallyODBC64_9000", timeout: int = 60, company_name: str = "Default",
+                 backend: str = "pyodbc"):
+        """
+        Args:
+            dsn_name: ODBC data source name for the TallyPrime company
+            timeout: Connection and query timeout in seconds
+            company_name: Display name used in logs and aggregation
+            backend: 'pyodbc' (default) or 'turbodbc' for columnar NumPy fetches
+        """
+        if backend == 'turbodbc' and turbodbc is None:
+            logging.warning("turbodbc is not installed, falling back to pyodbc")
+            backend = 'pyodbc'
+        
         self.dsn_name = dsn_name
         self.timeout = timeout
         self.company_name = company_name
+        self.backend = backend
         self.connection = None
+        self._stockitem_data = None
+    
+    def _connect(self, conn_string: str):
+        """Open a new connection using the configured backend"""
+        if self.backend == 'turbodbc':
+            return turbodbc.connect(
+                connection_string=conn_string,
+                turbodbc_options=turbodbc.make_options(
+                    read_buffer_size=turbodbc.Rows(ODBC_FETCH_SIZE),  # Same block size as the pyodbc fetchmany path
+                    use_async_io=True,
+                    prefer_unicode=True
+                )
+            )
+        
+        connection = pyodbc.connect(conn_string)
+        connection.timeout = self.timeout
+        return connection
+    
+    def _ping(self, connection) -> bool:
+        """Check that an already-open connection still responds to a minimal query"""
+        try:
+            cursor = connection.cursor()
+            cursor.execute(PING_QUERY)
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except ODBC_ERRORS:
+            return False
     
     def test_connection(self) -> bool:
-        """Test if TallyPrime ODBC connection is available"""
+        """Test if TallyPrime ODBC connection is available, keeping it open for the fetches that follow"""
         try:
-            conn_string = f"DSN={self.dsn_name};Timeout={self.timeout};"
-            test_conn = pyodbc.connect(conn_string)
-            test_conn.close()
+            # Reuse a pooled connection if it is still alive; only reconnect when it is missing or stale
+            with _CONNECTION_POOL_LOCK:
+                pooled = self.connection or _CONNECTION_POOL.get(self.dsn_name)
+            if pooled is not None and not self._ping(pooled):
+                logging.warning(f"Pooled ODBC connection for {self.dsn_name} is stale, reconnecting")
+                self.connection = pooled
+                self.close_connection()
+            
+            self._get_connection()
             return True
-        except pyodbc.Error as e:
+        except ODBC_ERRORS as e:
             logging.error(f"ODBC connection test failed: {e}")
             return False
     
     def _get_connection(self):
-        """Get or create ODBC connection"""
+        """Get the pooled ODBC connection for this DSN, creating it if needed"""
+        if not self.connection:
+            with _CONNECTION_POOL_LOCK:
+                self.connection = _CONNECTION_POOL.get(self.dsn_name)
+        
         if not self.connection:
+            # Connect outside the lock so different DSNs can connect concurrently
             try:
                 conn_string = f"DSN={self.dsn_name};Timeout={self.timeout};CommandTimeout={self.timeout};"
-                self.connection = pyodbc.connect(conn_string)
-                self.connection.timeout = self.timeout
-                logging.info(f"Successfully connected to TallyPrime via ODBC (timeout: {self.timeout}s)")
-            except pyodbc.Error as e:
+                connection = self._connect(conn_string)
+                logging.info(f"Successfully connected to TallyPrime via ODBC (timeout: {self.timeout}s, backend: {self.backend})")
+            except ODBC_ERRORS as e:
                 logging.error(f"Failed to connect to TallyPrime via ODBC: {e}")
                 raise
+            
+            with _CONNECTION_POOL_LOCK:
+                self.connection = _CONNECTION_POOL.setdefault(self.dsn_name, connection)
+            if self.connection is not connection:
+                connection.close()  # Another caller pooled a connection first
+        
         return self.connection
     
     def close_connection(self):
-        """Close ODBC connection"""
+        """Close ODBC connection and remove it from the pool"""
+        self._stockitem_data = None  # Cached query result is only valid for this connection
+        with _CONNECTION_POOL_LOCK:
+            if self.connection is not None and _CONNECTION_POOL.get(self.dsn_name) is self.connection:
+                del _CONNECTION_POOL[self.dsn_name]
         if self.connection:
             self.connection.close()
             self.connection = None
     
+    def _fetch_stockitem_data(self):
+        """
+        Run the combined STOCKITEM query once and cache the result until the connection is closed
+        
+        Both stock items and balance-difference movements come from STOCKITEM, so one
+        query (and one table scan in TallyPrime) serves both.
+        
+        Returns:
+            List of rows (pyodbc) or list of column arrays (turbodbc), in SELECT order:
+            name, parent, base units, closing balance, opening balance, closing value, closing rate
+        """
+        if self._stockitem_data is not None:
+            return self._stockitem_data
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        if self.backend == 'turbodbc':
+            cursor.execute(STOCKITEM_QUERY)
+            # NULLs arrive as masked entries; numerics (balance onwards) become 0 and text becomes
+            # None, so the same NULL fallbacks apply as on the pyodbc path
+            data = [
+                _unmask_column(column, 0 if index >= 3 else None)
+                for index, column in enumerate(cursor.fetchallnumpy().values())
+            ]
+            row_count = len(data[0]) if data else 0
+        else:
+            # Stream rows in ODBC_FETCH_SIZE blocks rather than a single fetchall()
+            cursor.arraysize = ODBC_FETCH_SIZE
+            cursor.execute(STOCKITEM_QUERY)
+            data = list(_iter_rows(cursor))
+            row_count = len(data)
+        
+        cursor.close()
+        logging.info(f"Fetched {row_count} STOCKITEM rows from TallyPrime")
+        self._stockitem_data = data
+        return data
+    
     def get_stock_items(self) -> List[Dict]:
         """
         Fetch all stock items from TallyPrime and return as JSON-compatible list
@@ -65,55 +274,69 @@ class TallyODBCAPI:
             List of dictionaries containing stock item data
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Query to get stock items with current balances
-            # Note: Column names may vary by TallyPrime version - adjust as needed
-            query = """
-                        SELECT 
-                            $Name AS STOCKITEMNAME, 
-                            $Parent AS PARENT, 
-                            $BaseUnits AS BASEUNITS, 
-                            $ClosingBalance AS CLOSINGBALANCE, 
-                            $ClosingValue AS CLOSINGVALUE, 
-                            $ClosingRate AS CLOSINGRATE
-                        FROM STOCKITEM
-                        """
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            logging.info(f"Fetched {len(rows)} stock items from TallyPrime")
-            # Convert to JSON-compatible format
-            items = []
-            for row in rows:
-                # Handle potential None values and convert to appropriate types
-                item_code = (row[0] or '').strip()
-                if not item_code:  # Skip empty item codes
-                    continue
-                    
-                item = {
+            data = self._fetch_stockitem_data()
+            
+            if self.backend == 'turbodbc':
+                items = self._stock_items_from_columns([data[i] for i in (0, 1, 2, 3, 5, 6)])
+                logging.info(f"Retrieved {len(items)} stock items via ODBC")
+                return items
+            
+            # Convert to JSON-compatible format, skipping rows with empty item codes
+            items = [
+                {
                     'item_code': item_code,
                     'item_name': item_code,  # Using item code as name for consistency
-                    'category': (row[1] or 'General').strip(),
-                    'unit': (row[2] or 'Nos').strip(),
-                    'current_balance': float(row[3] or 0),
-                    'closing_value': float(row[4] or 0),
-                    'rate': float(row[5] or 0)
+                    'category': (parent or 'General').strip(),
+                    'unit': (base_units or 'Nos').strip(),
+                    'current_balance': float(closing_balance or 0),
+                    'closing_value': float(closing_value or 0),
+                    'rate': float(closing_rate or 0)
                 }
-                items.append(item)
+                for name, parent, base_units, closing_balance, _opening_balance, closing_value, closing_rate in data
+                if (item_code := (name or '').strip())
+            ]
             
-            cursor.close()
             logging.info(f"Retrieved {len(items)} stock items via ODBC")
             return items
             
-        except pyodbc.Error as e:
+        except ODBC_ERRORS as e:
             logging.error(f"Error fetching stock items from TallyPrime: {e}")
             return []
         except Exception as e:
             logging.error(f"Unexpected error fetching stock items: {e}")
             return []
     
+    def _stock_items_from_columns(self, columns: List) -> List[Dict]:
+        """
+        Build stock item dictionaries from turbodbc column arrays
+        
+        Args:
+            columns: Column arrays in order (name, parent, units, balance, value, rate), already
+                unmasked by _unmask_column (NULL text is None, NULL numerics are 0)
+            
+        Returns:
+            List of dictionaries containing stock item data
+        """
+        def text(column, default: str) -> pd.Series:
+            return pd.Series(column, dtype=object).fillna('').replace('', default).astype(str).str.strip()
+        
+        def number(column) -> pd.Series:
+            return pd.to_numeric(pd.Series(column), errors='coerce').fillna(0.0).astype(float)
+        
+        names, parents, units, balances, values, rates = columns
+        frame = pd.DataFrame({
+            'item_code': text(names, ''),
+            'category': text(parents, 'General'),
+            'unit': text(units, 'Nos'),
+            'current_balance': number(balances),
+            'closing_value': number(values),
+            'rate': number(rates)
+        })
+        frame = frame[frame['item_code'] != '']  # Skip empty item codes
+        frame.insert(1, 'item_name', frame['item_code'])  # Using item code as name for consistency
+        
+        return frame.to_dict('records')
+    
     def get_stock_movements(self, from_date: datetime) -> List[Dict]:
         """
         Fetch stock movements using STOCKITEM balance differences
@@ -128,43 +351,26 @@ class TallyODBCAPI:
             List of dictionaries containing stock movement data
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Query STOCKITEM for opening and closing balances
-            query = """
-            SELECT 
-                $Name AS STOCKITEMNAME,
-                $ClosingBalance AS CLOSINGBALANCE,
-                $OpeningBalance AS OPENINGBALANCE
-            FROM 
-                STOCKITEM
-            WHERE 
-                $Name IS NOT NULL
-            ORDER BY 
-                $Name
-            """
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            logging.info(f"Retrieved {len(rows)} stock items for balance difference calculation")
-            
-            # Process balance differences into movement records
+            data = self._fetch_stockitem_data()
+            rows = zip(*data) if self.backend == 'turbodbc' else data
+            
+            # Process balance differences into movement records, all stamped with the fetch time
+            movement_date = datetime.now().isoformat()
             movements = []
-            for row in rows:
-                item_code = (row[0] or '').strip()
+            row_count = 0
+            for name, _parent, _base_units, closing_balance, opening_balance, _closing_value, _closing_rate in rows:
+                row_count += 1
+                item_code = (name or '').strip()
                 if not item_code:
                     continue
                     
-                closing_balance = float(row[1] or 0)
-                opening_balance = float(row[2] or 0)
-                net_change = closing_balance - opening_balance
+                net_change = float(closing_balance or 0) - float(opening_balance or 0)
                 
                 if net_change != 0:  # Only include items with changes
                     movement = {
                         'item_code': item_code,
                         'item_name': item_code,
-                        'date': datetime.now().isoformat(),
+                        'date': movement_date,
                         'quantity_change': net_change,
                         'billed_qty': abs(net_change),
                         'amount': 0,
@@ -173,11 +379,11 @@ class TallyODBCAPI:
                     }
                     movements.append(movement)
             
-            cursor.close()
+            logging.info(f"Retrieved {row_count} stock items for balance difference calculation")
             logging.info(f"Calculated {len(movements)} stock movements from balance differences")
             return movements
             
-        except pyodbc.Error as e:
+        except ODBC_ERRORS as e:
             logging.error(f"Error fetching stock movements from TallyPrime: {e}")
             return []
         except Exception as e:
@@ -199,15 +405,16 @@ class TallyODBCAPI:
             stock_items = self.get_stock_items()
             
             # Get recent movements (last 365 days by default)
-            from_date = datetime.now() - timedelta(days=365)
+            export_time = datetime.now()
+            from_date = export_time - timedelta(days=365)
             movements = self.get_stock_movements(from_date)
             
             # Create comprehensive JSON structure
             export_data = {
-                'export_timestamp': datetime.now().isoformat(),
+                'export_timestamp': export_time.isoformat(),
                 'export_info': {
                     'dsn_name': self.dsn_name,
-                    'export_date': datetime.now().strftime('%Y-%m-%d'),
+                    'export_date': export_time.strftime('%Y-%m-%d'),
                     'total_items': len(stock_items),
                     'total_movements': len(movements),
                     'movements_from_date': from_date.strftime('%Y-%m-%d')
@@ -217,8 +424,7 @@ class TallyODBCAPI:
             }
             
             # Write to JSON file with proper formatting
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            _write_json_file(filename, export_data)
             
             logging.info(f"TallyPrime data exported to {filename}")
             return True
@@ -243,18 +449,44 @@ class MultiCompanyTallyODBCAPI:
             company_api = TallyODBCAPI(
                 dsn_name=config['dsn_name'],
                 timeout=config.get('timeout', 60),  # Increased default timeout
-                company_name=config['company_name']
+                company_name=config['company_name'],
+                backend=config.get('backend', 'pyodbc')
             )
             self.companies.append(company_api)
         
+        # One worker per company, created on first use and reused by every fan-out call
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
         logging.info(f"Initialized multi-company API for {len(self.companies)} companies")
     
+    def _run_for_all_companies(self, action: Callable[[TallyODBCAPI], Any]) -> List[Tuple[TallyODBCAPI, Future]]:
+        """
+        Run an action against every company concurrently
+        
+        Each company has its own ODBC connection, so the I/O-bound queries overlap
+        and total wall time is roughly that of the slowest company.
+        
+        Args:
+            action: Callable taking a company API instance
+            
+        Returns:
+            List of (company_api, completed future) pairs in configured company order
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.companies)),
+                                                thread_name_prefix='tally-company')
+        
+        futures = [(company_api, self._executor.submit(action, company_api)) for company_api in self.companies]
+        for _company_api, future in futures:
+            future.exception()  # Wait for every company before the caller merges results
+        return futures
+    
     def test_all_connections(self) -> Dict[str, bool]:
         """Test connections to all companies"""
         results = {}
-        for company_api in self.companies:
+        for company_api, future in self._run_for_all_companies(lambda api: api.test_connection()):
             try:
-                result = company_api.test_connection()
+                result = future.result()
                 results[company_api.company_name] = result
                 if result:
                     logging.info(f" {company_api.company_name} connection successful")
@@ -273,53 +505,18 @@ class MultiCompanyTallyODBCAPI:
         Returns:
             List of dictionaries with combined stock data
         """
-        all_items = {}
+        item_columns = ['item_code', 'item_name', 'category', 'unit', 'current_balance', 'closing_value', 'rate']
+        company_frames = []
         
-        for company_api in self.companies:
+        logging.info(f"Fetching stock items from {len(self.companies)} companies...")
+        for company_api, future in self._run_for_all_companies(lambda api: api.get_stock_items()):
             try:
-                logging.info(f"Fetching stock items from {company_api.company_name}...")
-                company_items = company_api.get_stock_items()
+                company_items = future.result()
                 
-                for item in company_items:
-                    item_name = item['item_name']
-                    
-                    if item_name not in all_items:
-                        # First time seeing this item - initialize with company data
-                        all_items[item_name] = {
-                            'item_code': item_name,  # Use item_name as the unified identifier
-                            'item_name': item_name,
-                            'category': item['category'],
-                            'unit': item['unit'],
-                            'current_balance': item['current_balance'],
-                            'closing_value': item['closing_value'],
-                            'rate': item['rate'],
-                            'companies': {
-                                company_api.company_name: {
-                                    'item_code': item['item_code'],  # Store original company-specific code
-                                    'current_balance': item['current_balance'],
-                                    'closing_value': item['closing_value'],
-                                    'rate': item['rate']
-                                }
-                            }
-                        }
-                    else:
-                        # Item exists - aggregate the balances
-                        all_items[item_name]['current_balance'] += item['current_balance']
-                        all_items[item_name]['closing_value'] += item['closing_value']
-                        # Use weighted average for rate
-                        existing_qty = sum(comp['current_balance'] for comp in all_items[item_name]['companies'].values())
-                        if existing_qty + item['current_balance'] > 0:
-                            total_value = all_items[item_name]['closing_value'] + item['closing_value']
-                            total_qty = existing_qty + item['current_balance']
-                            all_items[item_name]['rate'] = total_value / total_qty if total_qty > 0 else 0
-                        
-                        # Track company-specific data
-                        all_items[item_name]['companies'][company_api.company_name] = {
-                            'item_code': item['item_code'],  # Store original company-specific code
-                            'current_balance': item['current_balance'],
-                            'closing_value': item['closing_value'],
-                            'rate': item['rate']
-                        }
+                if company_items:
+                    company_df = pd.DataFrame(company_items, columns=item_columns)
+                    company_df['company'] = company_api.company_name
+                    company_frames.append(company_df)
                 
                 logging.info(f"Retrieved {len(company_items)} items from {company_api.company_name}")
                 
@@ -327,8 +524,73 @@ class MultiCompanyTallyODBCAPI:
                 logging.error(f"Failed to fetch stock items from {company_api.company_name}: {e}")
                 continue
         
+        if not company_frames:
+            logging.info("Aggregated 0 unique items from all companies")
+            return []
+        
+        # Sum balances per item_name, keeping first-seen order and attributes
+        all_items_df = pd.concat(company_frames, ignore_index=True)
+        grouped = all_items_df.groupby('item_name', sort=False).agg(
+            category=('category', 'first'),
+            unit=('unit', 'first'),
+            current_balance=('current_balance', 'sum'),
+            closing_value=('closing_value', 'sum'),
+            first_rate=('rate', 'first'),
+            company_count=('company', 'size'),
+            category_variants=('category', 'nunique'),
+            unit_variants=('unit', 'nunique')
+        )
+        
+        # Same item name with a different category/unit signature in another company is still one
+        # item (one item_code upsert), but summing across units may be wrong - surface it
+        mismatched = grouped.index[(grouped['category_variants'] > 1) | (grouped['unit_variants'] > 1)].tolist()
+        if mismatched:
+            logging.warning(f"{len(mismatched)} items differ in category/unit across companies, "
+                            f"using the first company's values: {', '.join(mismatched[:10])}"
+                            f"{' ...' if len(mismatched) > 10 else ''}")
+        
+        # Use weighted average for rate across companies; single-company items keep Tally's own rate
+        use_weighted_rate = (grouped['company_count'] > 1) & (grouped['current_balance'] > 0)
+        grouped['rate'] = (grouped['closing_value'] / grouped['current_balance']).where(use_weighted_rate, grouped['first_rate'])
+        
+        # Track company-specific data, storing the original company-specific code
+        companies_by_item = {}
+        for item_name, company, item_code, current_balance, closing_value, rate in zip(
+            all_items_df['item_name'].tolist(),
+            all_items_df['company'].tolist(),
+            all_items_df['item_code'].tolist(),
+            all_items_df['current_balance'].tolist(),
+            all_items_df['closing_value'].tolist(),
+            all_items_df['rate'].tolist()
+        ):
+            companies_by_item.setdefault(item_name, {})[company] = {
+                'item_code': item_code,
+                'current_balance': current_balance,
+                'closing_value': closing_value,
+                'rate': rate
+            }
+        
         # Convert to list format
-        aggregated_items = list(all_items.values())
+        aggregated_items = [
+            {
+                'item_code': item_name,  # Use item_name as the unified identifier
+                'item_name': item_name,
+                'category': category,
+                'unit': unit,
+                'current_balance': current_balance,
+                'closing_value': closing_value,
+                'rate': rate,
+                'companies': companies_by_item[item_name]
+            }
+            for item_name, category, unit, current_balance, closing_value, rate in zip(
+                grouped.index.tolist(),
+                grouped['category'].tolist(),
+                grouped['unit'].tolist(),
+                grouped['current_balance'].tolist(),
+                grouped['closing_value'].tolist(),
+                grouped['rate'].tolist()
+            )
+        ]
         logging.info(f"Aggregated {len(aggregated_items)} unique items from all companies")
         
         return aggregated_items
@@ -343,17 +605,42 @@ class MultiCompanyTallyODBCAPI:
         Returns:
             List of combined movement dictionaries
         """
-        all_movements = []
+        # Single pass over every company's rows, keyed by item_name so each row is one dict lookup
+        aggregated_movements = {}
         
-        for company_api in self.companies:
+        logging.info(f"Fetching stock movements from {len(self.companies)} companies...")
+        for company_api, future in self._run_for_all_companies(lambda api: api.get_stock_movements(from_date)):
             try:
-                logging.info(f"Fetching stock movements from {company_api.company_name}...")
-                company_movements = company_api.get_stock_movements(from_date)
+                company_movements = future.result()
                 
-                # Add company identifier to each movement
                 for movement in company_movements:
-                    movement['company'] = company_api.company_name
-                    all_movements.append(movement)
+                    item_name = movement['item_name']
+                    company_change = {
+                        'original_item_code': movement['item_code'],  # Store original company-specific code
+                        'quantity_change': movement['quantity_change'],
+                        'amount': movement['amount']
+                    }
+                    
+                    aggregated = aggregated_movements.get(item_name)
+                    if aggregated is None:
+                        # First movement for this item
+                        aggregated_movements[item_name] = {
+                            'item_code': item_name,  # Use item_name as unified identifier
+                            'item_name': item_name,
+                            'date': movement['date'],
+                            'quantity_change': movement['quantity_change'],
+                            'billed_qty': movement['billed_qty'],
+                            'amount': movement['amount'],
+                            'voucher_type': 'Multi-Company Balance Change',
+                            'voucher_number': '',
+                            'companies': {company_api.company_name: company_change}
+                        }
+                    else:
+                        # Aggregate with existing movement and track company-specific changes
+                        aggregated['quantity_change'] += movement['quantity_change']
+                        aggregated['billed_qty'] += movement['billed_qty']
+                        aggregated['amount'] += movement['amount']
+                        aggregated['companies'][company_api.company_name] = company_change
                 
                 logging.info(f"Retrieved {len(company_movements)} movements from {company_api.company_name}")
                 
@@ -361,43 +648,6 @@ class MultiCompanyTallyODBCAPI:
                 logging.error(f"Failed to fetch stock movements from {company_api.company_name}: {e}")
                 continue
         
-        # Aggregate movements by item_name
-        aggregated_movements = {}
-        for movement in all_movements:
-            item_name = movement['item_name']
-            
-            if item_name not in aggregated_movements:
-                # First movement for this item
-                aggregated_movements[item_name] = {
-                    'item_code': item_name,  # Use item_name as unified identifier
-                    'item_name': item_name,
-                    'date': movement['date'],
-                    'quantity_change': movement['quantity_change'],
-                    'billed_qty': movement['billed_qty'],
-                    'amount': movement['amount'],
-                    'voucher_type': 'Multi-Company Balance Change',
-                    'voucher_number': '',
-                    'companies': {
-                        movement['company']: {
-                            'original_item_code': movement['item_code'],  # Store original company-specific code
-                            'quantity_change': movement['quantity_change'],
-                            'amount': movement['amount']
-                        }
-                    }
-                }
-            else:
-                # Aggregate with existing movement
-                aggregated_movements[item_name]['quantity_change'] += movement['quantity_change']
-                aggregated_movements[item_name]['billed_qty'] += movement['billed_qty']
-                aggregated_movements[item_name]['amount'] += movement['amount']
-                
-                # Track company-specific changes
-                aggregated_movements[item_name]['companies'][movement['company']] = {
-                    'original_item_code': movement['item_code'],  # Store original company-specific code
-                    'quantity_change': movement['quantity_change'],
-                    'amount': movement['amount']
-                }
-        
         result = list(aggregated_movements.values())
         logging.info(f"Aggregated {len(result)} unique item movements from all companies")
         
@@ -405,27 +655,30 @@ class MultiCompanyTallyODBCAPI:
     
     def close_all_connections(self):
         """Close all company connections"""
-        for company_api in self.companies:
+        for company_api, future in self._run_for_all_companies(lambda api: api.close_connection()):
             try:
-                company_api.close_connection()
+                future.result()
                 logging.info(f"Closed connection for {company_api.company_name}")
             except Exception as e:
                 logging.warning(f"Error closing connection for {company_api.company_name}: {e}")
+        
+        self._executor.shutdown()
+        self._executor = None
     
     def export_multi_company_data(self, filename: str = 'multi_company_tally_export.json') -> bool:
         """Export aggregated data from all companies to JSON file"""
         try:
-            from_date = datetime.now() - timedelta(days=30)
+            export_time = datetime.now()
+            from_date = export_time - timedelta(days=30)
             
             export_data = {
-                'export_timestamp': datetime.now().isoformat(),
+                'export_timestamp': export_time.isoformat(),
                 'companies': [api.company_name for api in self.companies],
                 'aggregated_stock_items': self.get_aggregated_stock_items(),
                 'aggregated_stock_movements': self.get_aggregated_stock_movements(from_date)
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
+            _write_json_file(filename, export_data)
             
             logging.info(f"Multi-company data exported to {filename}")
             return True
@@ -456,7 +709,22 @@ class CleanSlateEngine:
     
     def __init__(self, config: Dict):
         self.config = config
+        self.physical_baseline = {}
+        self._baseline_mtime = None
+        self.refresh_physical_baseline()
+    
+    def refresh_physical_baseline(self):
+        """Reload the physical baseline CSV if it has been modified since it was last loaded"""
+        try:
+            mtime = os.stat(self.config['sync']['physical_baseline_file']).st_mtime
+        except OSError:
+            mtime = None  # Missing file: let the loader log it on every attempt
+        
+        if mtime is not None and mtime == self._baseline_mtime:
+            return
+        
         self.physical_baseline = self._load_physical_baseline()
+        self._baseline_mtime = mtime
     
     def _load_physical_baseline(self) -> Dict[str, Dict]:
         """Load physical baseline data from CSV"""
@@ -464,17 +732,35 @@ class CleanSlateEngine:
         baseline_data = {}
         
         try:
-            with open(baseline_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    item_name = row['item_name'].strip()
-                    if item_name:
-                        baseline_data[item_name] = {
-                            'item_code': row.get('item_code', '').strip(),  # Keep original item_code for reference
-                            'physical_count': float(row['physical_count']),
-                            'baseline_date': datetime.strptime(row['baseline_date'], '%Y-%m-%d'),
-                            'notes': row.get('notes', '').strip()
-                        }
+            # Parse with pandas' C reader as text (blanks stay ''), then convert typed columns so a
+            # malformed row can be dropped on its own instead of failing the whole load
+            baseline_df = pd.read_csv(baseline_file, encoding='utf-8', dtype=str, keep_default_na=False)
+            for column in ('item_code', 'notes'):
+                baseline_df[column] = baseline_df[column].str.strip() if column in baseline_df else ''
+            baseline_df['item_name'] = baseline_df['item_name'].str.strip()
+            baseline_df = baseline_df[baseline_df['item_name'] != '']
+            
+            baseline_df['physical_count'] = pd.to_numeric(baseline_df['physical_count'].str.strip(), errors='coerce')
+            baseline_df['baseline_date'] = pd.to_datetime(
+                baseline_df['baseline_date'].str.strip(), format='%Y-%m-%d', errors='coerce'
+            )
+            invalid = baseline_df['physical_count'].isna() | baseline_df['baseline_date'].isna()
+            if invalid.any():
+                invalid_names = baseline_df.loc[invalid, 'item_name'].tolist()
+                logging.warning(f"Skipping {len(invalid_names)} physical baseline rows with an invalid physical_count "
+                                f"or baseline_date (expected YYYY-MM-DD): {', '.join(invalid_names[:10])}"
+                                f"{' ...' if len(invalid_names) > 10 else ''}")
+                baseline_df = baseline_df[~invalid]
+            
+            baseline_data = {
+                row.item_name: {
+                    'item_code': row.item_code,  # Keep original item_code for reference
+                    'physical_count': float(row.physical_count),
+                    'baseline_date': row.baseline_date.to_pydatetime(),
+                    'notes': row.notes
+                }
+                for row in baseline_df.itertuples(index=False)
+            }
             
             logging.info(f"Loaded {len(baseline_data)} physical baseline records")
             
@@ -489,6 +775,9 @@ class CleanSlateEngine:
         """
         Calculate clean slate stock levels using JSON data
         
+        Items and baselines are joined as DataFrames, and the per-item delta is a
+        single filtered NumPy scatter-add over movement quantities rather than a Python loop.
+        
         Args:
             tally_items: List of stock items from TallyPrime
             tally_movements: List of stock movements from TallyPrime
@@ -496,66 +785,83 @@ class CleanSlateEngine:
         Returns:
             List of dictionaries with clean slate calculations
         """
-        clean_slate_items = []
+        if not tally_items:
+            logging.info("Calculated clean slate for 0 items")
+            return []
         
-        for tally_item in tally_items:
-            item_name = tally_item['item_name']
-            
-            # Get physical baseline for this item (now using item_name)
-            baseline = self.physical_baseline.get(item_name, {})
-            physical_count = baseline.get('physical_count', 0)
-            baseline_date = baseline.get('baseline_date', datetime.now() - timedelta(days=365))
-            
-            # Calculate Tally delta since baseline
-            tally_delta = self._calculate_tally_delta(item_name, baseline_date, tally_movements)
-            
-            # Clean Slate = Physical Baseline + Tally Delta
-            clean_slate_stock = physical_count + tally_delta
-            
-            clean_slate_item = {
+        sync_time = datetime.now()
+        default_baseline_date = sync_time - timedelta(days=365)
+        
+        items_df = pd.DataFrame(tally_items)
+        for column, default in (('category', 'General'), ('unit', 'Nos'), ('current_balance', 0)):
+            items_df[column] = items_df[column].fillna(default) if column in items_df else default
+        
+        # Attach physical baseline for each item (keyed by item_name), only joining
+        # baselines for items actually present in this sync
+        item_names = set(items_df['item_name'])
+        baseline_records = [
+            {'item_name': name, 'physical_count': baseline['physical_count'], 'baseline_date': baseline['baseline_date']}
+            for name, baseline in self.physical_baseline.items()
+            if name in item_names
+        ]
+        if baseline_records:
+            merged = items_df.merge(pd.DataFrame(baseline_records), on='item_name', how='left')
+        else:
+            # No item has a baseline (e.g. first onboarding) - skip the join entirely
+            merged = items_df.assign(physical_count=0.0, baseline_date=pd.NaT)
+        merged['physical_count'] = merged['physical_count'].fillna(0.0).astype(float)
+        merged['baseline_date'] = pd.to_datetime(merged['baseline_date']).fillna(pd.Timestamp(default_baseline_date))
+        
+        # Calculate Tally delta since baseline: sum of movements dated on/after each item's baseline
+        if tally_movements:
+            movements_df = pd.DataFrame(tally_movements, columns=['item_name', 'date', 'quantity_change'])
+            movements_df['date'] = pd.to_datetime(movements_df['date'], errors='coerce', format='ISO8601')  # Invalid dates become NaT and never match
+            movements_df['quantity_change'] = movements_df['quantity_change'].fillna(0.0).astype(float)
+            # Index each movement to its item's slot once (-1 for items not being synced), then
+            # gather baselines and scatter-add quantities as flat NumPy arrays
+            first_rows = merged.drop_duplicates('item_name')
+            item_index = pd.Index(first_rows['item_name'])
+            movement_slots = item_index.get_indexer(movements_df['item_name'])
+            baseline_dates = first_rows['baseline_date'].to_numpy(dtype='datetime64[ns]')
+            # datetime64 values compare as int64 epoch nanoseconds; NaT never matches
+            in_window = (movement_slots >= 0) & (movements_df['date'].to_numpy() >= baseline_dates[movement_slots])
+            deltas = np.zeros(len(item_index), dtype=np.float64)
+            np.add.at(deltas, movement_slots[in_window], movements_df['quantity_change'].to_numpy()[in_window])
+            merged['tally_delta'] = deltas[item_index.get_indexer(merged['item_name'])]
+        else:
+            # No movements in the window - every delta is zero, so skip the movement join
+            logging.info("No stock movements in window; clean slate stock equals physical baseline")
+            merged['tally_delta'] = 0.0
+        
+        # Clean Slate = Physical Baseline + Tally Delta
+        merged['current_stock'] = merged['physical_count'] + merged['tally_delta']
+        
+        clean_slate_items = [
+            {
                 'item_code': item_name,  # Use item_name as unified identifier
                 'item_name': item_name,
-                'category': tally_item.get('category', 'General'),
-                'unit': tally_item.get('unit', 'Nos'),
-                'current_stock': clean_slate_stock,
+                'category': category,
+                'unit': unit,
+                'current_stock': current_stock,
                 'physical_baseline': physical_count,
                 'tally_delta': tally_delta,
-                'tally_balance': tally_item.get('current_balance', 0),  # For comparison
-                'last_sync': datetime.now(),
+                'tally_balance': tally_balance,  # For comparison
+                'last_sync': sync_time,
                 'sync_source': 'tally_odbc_sync'
             }
-            
-            clean_slate_items.append(clean_slate_item)
+            for item_name, category, unit, current_stock, physical_count, tally_delta, tally_balance in zip(
+                merged['item_name'].tolist(),
+                merged['category'].tolist(),
+                merged['unit'].tolist(),
+                merged['current_stock'].tolist(),
+                merged['physical_count'].tolist(),
+                merged['tally_delta'].tolist(),
+                merged['current_balance'].tolist()
+            )
+        ]
         
         logging.info(f"Calculated clean slate for {len(clean_slate_items)} items")
         return clean_slate_items
-    
-    def _calculate_tally_delta(self, item_name: str, baseline_date: datetime, movements: List[Dict]) -> float:
-        """
-        Calculate net stock movement from Tally since baseline date
-        
-        Args:
-            item_name: Item name to calculate delta for
-            baseline_date: Date from which to calculate movements
-            movements: List of stock movements
-            
-        Returns:
-            Net quantity change since baseline date
-        """
-        delta = 0.0
-        
-        for movement in movements:
-            if movement.get('item_name') == item_name:
-                try:
-                    movement_date = datetime.fromisoformat(movement.get('date', ''))
-                    if movement_date >= baseline_date:
-                        quantity_change = movement.get('quantity_change', 0)
-                        delta += quantity_change
-                except (ValueError, TypeError):
-                    # Skip movements with invalid dates
-                    continue
-        
-        return delta
 
 
 class SupabaseSync:
@@ -577,10 +883,77 @@ class SupabaseSync:
             logging.error(f"Supabase connection failed: {e}")
             return False
     
+    def _build_items_payload(self, batch: List[Dict], updated_at: str) -> List[Dict]:
+        """Prepare bulk data for the items table"""
+        return [
+            {
+                'item_code': item['item_code'],
+                'item_name': item['item_name'],
+                'category': item['category'],
+                'unit': item['unit'],
+                'updated_at': updated_at
+            }
+            for item in batch
+        ]
+    
+    def _build_stock_payload(self, batch: List[Dict], upserted_items: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Prepare bulk data for the stock_levels table from the upserted item rows
+        
+        Returns:
+            Tuple of (stock level rows, item codes included); items missing from the
+            upserted rows are left out of both
+        """
+        # Create mapping of item_code to item_id for stock levels
+        item_code_to_id = {item['item_code']: item['id'] for item in upserted_items}
+        
+        included_items = [item for item in batch if item['item_code'] in item_code_to_id]
+        stock_data = [
+            {
+                'item_id': item_code_to_id[item['item_code']],
+                'current_stock': item['current_stock'],
+                'physical_baseline': item['physical_baseline'],
+                'tally_delta': item['tally_delta'],
+                'last_sync': item['last_sync'].isoformat(),
+                'sync_source': item['sync_source']
+            }
+            for item in included_items
+        ]
+        return stock_data, [item['item_code'] for item in included_items]
+    
+    def _build_rpc_payload(self, batch: List[Dict], updated_at: str) -> List[Dict]:
+        """Prepare combined item and stock level rows for the upsert_items_and_stock RPC"""
+        return [
+            {
+                'item_code': item['item_code'],
+                'item_name': item['item_name'],
+                'category': item['category'],
+                'unit': item['unit'],
+                'updated_at': updated_at,
+                'current_stock': item['current_stock'],
+                'physical_baseline': item['physical_baseline'],
+                'tally_delta': item['tally_delta'],
+                'last_sync': item['last_sync'].isoformat(),
+                'sync_source': item['sync_source']
+            }
+            for item in batch
+        ]
+    
+    def _item_digest(self, item: Dict) -> str:
+        """Hash the synced fields of a clean slate item so unchanged items can be skipped"""
+        content = repr((
+            item['item_name'], item['category'], item['unit'],
+            item['current_stock'], item['physical_baseline'], item['tally_delta']
+        ))
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    
     def sync_items(self, items: List[Dict]) -> bool:
         """
         Sync clean slate items to Supabase
         
+        When sync.skip_unchanged_items is set, items whose content hash matches the
+        previous successful sync (kept in a local shelve cache) are not re-sent.
+        
         Args:
             items: List of clean slate item dictionaries
             
@@ -588,66 +961,153 @@ class SupabaseSync:
             True if sync successful, False otherwise
         """
         try:
-            batch_size = self.config['sync'].get('batch_size', 150)  # Increased default batch size
-            synced_count = 0
-            
-            for i in range(0, len(items), batch_size):
-                batch = items[i:i + batch_size]
-                
-                # Prepare bulk data for items table
-                items_data = []
-                for item in batch:
-                    item_data = {
-                        'item_code': item['item_code'],
-                        'item_name': item['item_name'],
-                        'category': item['category'],
-                        'unit': item['unit'],
-                        'updated_at': datetime.now().isoformat()
-                    }
-                    items_data.append(item_data)
-                
-                # Bulk upsert items
-                items_result = self.client.table('items').upsert(
-                    items_data,
-                    on_conflict='item_code'
-                ).execute()
-                
-                if items_result.data:
-                    # Create mapping of item_code to item_id for stock levels
-                    item_code_to_id = {item['item_code']: item['id'] for item in items_result.data}
-                    
-                    # Prepare bulk data for stock_levels table
-                    stock_data = []
-                    for item in batch:
-                        if item['item_code'] in item_code_to_id:
-                            stock_record = {
-                                'item_id': item_code_to_id[item['item_code']],
-                                'current_stock': item['current_stock'],
-                                'physical_baseline': item['physical_baseline'],
-                                'tally_delta': item['tally_delta'],
-                                'last_sync': item['last_sync'].isoformat(),
-                                'sync_source': item['sync_source']
-                            }
-                            stock_data.append(stock_record)
+            if self.config['sync'].get('skip_unchanged_items', False):
+                cache_file = self.config['sync'].get('sync_cache_file', '.tally_sync_cache')
+                with shelve.open(cache_file) as cache:
+                    digests = {item['item_code']: self._item_digest(item) for item in items}
+                    changed_items = [item for item in items if cache.get(item['item_code']) != digests[item['item_code']]]
+                    logging.info(f"Skipping {len(items) - len(changed_items)} unchanged items")
                     
-                    # Bulk upsert stock levels
-                    if stock_data:
-                        self.client.table('stock_levels').upsert(
-                            stock_data,
-                            on_conflict='item_id'
-                        ).execute()
-                        
-                        synced_count += len(stock_data)
-                
-                logging.info(f"Bulk synced batch {i//batch_size + 1}: {len(batch)} items")
+                    synced_codes = self._upsert_items(changed_items)
+                    # Only cache items that were actually written, so dropped rows are retried next run
+                    cache.update({item_code: digests[item_code] for item_code in synced_codes})
+            else:
+                synced_codes = self._upsert_items(items)
             
-            logging.info(f"Successfully bulk synced {synced_count} items to Supabase")
+            logging.info(f"Successfully bulk synced {len(synced_codes)} items to Supabase")
             return True
             
         except Exception as e:
             logging.error(f"Failed to sync items to Supabase: {e}")
             return False
     
+    def _upsert_items(self, items: List[Dict]) -> List[str]:
+        """
+        Upsert items and their stock levels in batches
+        
+        Batches are sent one at a time through the Supabase client, or concurrently
+        over the REST API when performance.enable_parallel_processing is set. With
+        sync.use_upsert_rpc, each batch is a single upsert_items_and_stock RPC call
+        instead of separate items and stock_levels upserts.
+        
+        Args:
+            items: List of clean slate item dictionaries
+            
+        Returns:
+            Item codes whose item and stock level rows were written
+        """
+        batch_size = self.config['sync'].get('batch_size', 150)  # Increased default batch size
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        updated_at = datetime.now().isoformat()  # One timestamp for the whole sync run
+        
+        if self.config.get('performance', {}).get('enable_parallel_processing', False):
+            return asyncio.run(self._sync_batches_async(batches, updated_at))
+        
+        use_rpc = self.config['sync'].get('use_upsert_rpc', False)
+        synced_codes = []
+        for batch_number, batch in enumerate(batches, start=1):
+            if use_rpc:
+                # Upsert items and stock levels in one request and one transaction
+                self.client.rpc(
+                    'upsert_items_and_stock',
+                    {'payload': self._build_rpc_payload(batch, updated_at)}
+                ).execute()
+                synced_codes.extend(item['item_code'] for item in batch)  # The RPC writes the whole batch or fails
+                logging.info(f"Bulk synced batch {batch_number}: {len(batch)} items")
+                continue
+            
+            # Bulk upsert items (one request per batch)
+            items_result = self.client.table('items').upsert(
+                self._build_items_payload(batch, updated_at),
+                on_conflict='item_code'
+            ).execute()
+            
+            if items_result.data:
+                stock_data, stock_item_codes = self._build_stock_payload(batch, items_result.data)
+                
+                # Bulk upsert stock levels
+                if stock_data:
+                    self.client.table('stock_levels').upsert(
+                        stock_data,
+                        on_conflict='item_id'
+                    ).execute()
+                    
+                    synced_codes.extend(stock_item_codes)
+            
+            logging.info(f"Bulk synced batch {batch_number}: {len(batch)} items")
+        
+        return synced_codes
+    
+    async def _sync_batches_async(self, batches: List[List[Dict]], updated_at: str) -> List[str]:
+        """
+        Upsert all batches over the Supabase REST API with bounded concurrency
+        
+        Each batch is a single bulk POST per table, with bodies serialized by
+        _dumps_json (orjson when available) instead of httpx's stdlib encoder.
+        
+        Args:
+            batches: Clean slate items split into batches
+            updated_at: Timestamp applied to every upserted item
+            
+        Returns:
+            Item codes whose item and stock level rows were written
+        """
+        key = self.config['supabase']['key']
+        headers = {
+            'apikey': key,
+            'Authorization': f"Bearer {key}",
+            'Content-Type': 'application/json'
+        }
+        timeout = self.config.get('performance', {}).get('query_timeout', 300)
+        semaphore = asyncio.Semaphore(self.config['sync'].get('connection_pool_size', 5))
+        
+        async with httpx.AsyncClient(
+            base_url=f"{self.config['supabase']['url'].rstrip('/')}/rest/v1",
+            headers=headers,
+            timeout=timeout
+        ) as client:
+            results = await asyncio.gather(*[
+                self._upsert_batch_async(client, semaphore, batch_number, batch, updated_at)
+                for batch_number, batch in enumerate(batches, start=1)
+            ])
+        
+        return [item_code for batch_codes in results for item_code in batch_codes]
+    
+    async def _upsert_batch_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                  batch_number: int, batch: List[Dict], updated_at: str) -> List[str]:
+        """Upsert one batch of items and their stock levels, returning the item codes written"""
+        async with semaphore:
+            if self.config['sync'].get('use_upsert_rpc', False):
+                # Upsert items and stock levels in one request and one transaction
+                rpc_response = await client.post(
+                    '/rpc/upsert_items_and_stock',
+                    content=_dumps_json({'payload': self._build_rpc_payload(batch, updated_at)})
+                )
+                rpc_response.raise_for_status()
+                logging.info(f"Bulk synced batch {batch_number}: {len(batch)} items")
+                return [item['item_code'] for item in batch]
+            
+            items_response = await client.post(
+                '/items',
+                params={'on_conflict': 'item_code'},
+                headers={'Prefer': 'resolution=merge-duplicates,return=representation'},
+                content=_dumps_json(self._build_items_payload(batch, updated_at))
+            )
+            items_response.raise_for_status()
+            
+            stock_data, stock_item_codes = self._build_stock_payload(batch, items_response.json())
+            if stock_data:
+                stock_response = await client.post(
+                    '/stock_levels',
+                    params={'on_conflict': 'item_id'},
+                    headers={'Prefer': 'resolution=merge-duplicates,return=minimal'},
+                    content=_dumps_json(stock_data)
+                )
+                stock_response.raise_for_status()
+            
+            logging.info(f"Bulk synced batch {batch_number}: {len(batch)} items")
+            return stock_item_codes
+    
     def log_sync_status(self, items_processed: int, status: str, error_message: str = None):
         """Log sync operation status"""
         try:
@@ -679,19 +1139,22 @@ class TallySyncManager:
         else:
             self.tally_api = TallyODBCAPI(
                 self.config['tally']['odbc_dsn'],
-                self.config['tally']['connection_timeout']
+                self.config['tally']['connection_timeout'],
+                backend=self.config['tally'].get('backend', 'pyodbc')
             )
             self.multi_company_mode = False
             logging.info("Initialized in single-company mode")
         
         self.clean_slate_engine = CleanSlateEngine(self.config)
         self.supabase_sync = SupabaseSync(self.config)
+        
+        # Single worker for side work that can overlap the sync's TallyPrime I/O
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sync-background')
     
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from JSON file"""
         try:
-            with open(config_file, 'r') as file:
-                return json.load(file)
+            return _read_json_file(config_file)
         except FileNotFoundError:
             logging.error(f"Configuration file not found: {config_file}")
             sys.exit(1)
@@ -716,8 +1179,15 @@ class TallySyncManager:
     def run_sync(self) -> bool:
         """Execute the complete ODBC/JSON-based sync process"""
         logging.info("Starting TallyPrime Clean Slate sync process (ODBC/JSON)")
+        debug_export = None
         
         try:
+            # The manager is long-lived under the scheduler, so pick up baseline CSV edits made since the last run
+            self.clean_slate_engine.refresh_physical_baseline()
+            
+            # Check Supabase while the TallyPrime connections are being tested
+            supabase_check = self._background.submit(self.supabase_sync.test_connection)
+            
             # Test connections based on mode
             if self.multi_company_mode:
                 connection_results = self.tally_api.test_all_connections()
@@ -728,7 +1198,7 @@ class TallySyncManager:
                 if not self.tally_api.test_connection():
                     raise Exception("Cannot connect to TallyPrime via ODBC. Check DSN configuration and ensure TallyPrime is running.")
             
-            if not self.supabase_sync.test_connection():
+            if not supabase_check.result():
                 raise Exception("Cannot connect to Supabase. Check your configuration and internet connection.")
             
             logging.info("All connections verified successfully")
@@ -767,8 +1237,9 @@ class TallySyncManager:
                 tally_movements
             )
             
-            # Optional: Export to JSON file for debugging
-            self.tally_api.export_to_json_file('debug_tally_export.json')
+            # Optional: Export to JSON file for debugging, written in the background during the upload
+            if self.config['sync'].get('debug_export', False):
+                debug_export = self._background.submit(self.tally_api.export_to_json_file, 'debug_tally_export.json')
             
             # Sync to Supabase
             logging.info("Syncing data to Supabase...")
@@ -796,6 +1267,10 @@ class TallySyncManager:
             self.supabase_sync.log_sync_status(0, 'ERROR', str(e))
             return False
         finally:
+            # The export reads the connection's cached data, so let it finish before closing
+            if debug_export is not None:
+                debug_export.result()
+            
             # Always close the ODBC connection
             self.tally_api.close_connection()
 
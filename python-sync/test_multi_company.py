@@ -10,7 +10,7 @@ import json
 import logging
 import sys
 from datetime import datetime, timedelta
-from tally_sync import MultiCompanyTallyODBCAPI
+from tally_sync import MultiCompanyTallyODBCAPI, _read_json_file
 
 def setup_logging():
     """Setup basic logging for testing"""
@@ -23,8 +23,7 @@ def setup_logging():
 def load_config(config_file: str = 'config.json'):
     """Load multi-company configuration"""
     try:
-        with open(config_file, 'r') as file:
-            return json.load(file)
+        return _read_json_file(config_file)
     except FileNotFoundError:
         logging.error(f"Configuration file not found: {config_file}")
         sys.exit(1)
@@ -32,15 +31,10 @@ def load_config(config_file: str = 'config.json'):
         logging.error(f"Invalid JSON in configuration file: {e}")
         sys.exit(1)
 
-def test_multi_company_connections():
+def test_multi_company_connections(multi_api: MultiCompanyTallyODBCAPI):
     """Test connections to all configured TallyPrime companies"""
     logging.info("=== Multi-Company TallyPrime Connection Test ===")
     
-    config = load_config()
-    
-    # Initialize multi-company API
-    multi_api = MultiCompanyTallyODBCAPI(config['tally']['companies'])
-    
     # Test all connections
     logging.info("Testing connections to all companies...")
     connection_results = multi_api.test_all_connections()
@@ -63,13 +57,10 @@ def test_multi_company_connections():
     
     return True
 
-def test_aggregated_stock_items():
+def test_aggregated_stock_items(multi_api: MultiCompanyTallyODBCAPI):
     """Test aggregated stock items retrieval"""
     logging.info("=== Testing Aggregated Stock Items ===")
     
-    config = load_config()
-    multi_api = MultiCompanyTallyODBCAPI(config['tally']['companies'])
-    
     try:
         # Get aggregated stock items
         aggregated_items = multi_api.get_aggregated_stock_items()
@@ -84,9 +75,12 @@ def test_aggregated_stock_items():
             logging.info(f"  Total Balance: {sample_item['current_balance']}")
             logging.info(f"  Companies: {list(sample_item['companies'].keys())}")
             
-            # Show company breakdown
-            for company, data in sample_item['companies'].items():
-                logging.info(f"    {company}: {data['current_balance']} units (Code: {data['item_code']})")
+            # Show company breakdown as one log record, formatted only if INFO is enabled
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("\n".join(
+                    f"    {company}: {data['current_balance']} units (Code: {data['item_code']})"
+                    for company, data in sample_item['companies'].items()
+                ))
         
         return aggregated_items
         
@@ -94,13 +88,10 @@ def test_aggregated_stock_items():
         logging.error(f"Failed to retrieve aggregated stock items: {e}")
         return []
 
-def test_aggregated_movements():
+def test_aggregated_movements(multi_api: MultiCompanyTallyODBCAPI):
     """Test aggregated stock movements retrieval"""
     logging.info("=== Testing Aggregated Stock Movements ===")
     
-    config = load_config()
-    multi_api = MultiCompanyTallyODBCAPI(config['tally']['companies'])
-    
     try:
         # Get movements from last 30 days
         from_date = datetime.now() - timedelta(days=30)
@@ -116,9 +107,12 @@ def test_aggregated_movements():
             logging.info(f"  Total Change: {sample_movement['quantity_change']}")
             logging.info(f"  Companies: {list(sample_movement['companies'].keys())}")
             
-            # Show company breakdown
-            for company, data in sample_movement['companies'].items():
-                logging.info(f"    {company}: {data['quantity_change']} units (Code: {data['original_item_code']})")
+            # Show company breakdown as one log record, formatted only if INFO is enabled
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("\n".join(
+                    f"    {company}: {data['quantity_change']} units (Code: {data['original_item_code']})"
+                    for company, data in sample_movement['companies'].items()
+                ))
         
         return aggregated_movements
         
@@ -126,13 +120,10 @@ def test_aggregated_movements():
         logging.error(f"Failed to retrieve aggregated movements: {e}")
         return []
 
-def export_test_data():
+def export_test_data(multi_api: MultiCompanyTallyODBCAPI):
     """Export multi-company test data to JSON file"""
     logging.info("=== Exporting Multi-Company Test Data ===")
     
-    config = load_config()
-    multi_api = MultiCompanyTallyODBCAPI(config['tally']['companies'])
-    
     try:
         success = multi_api.export_multi_company_data('test_multi_company_export.json')
         if success:
@@ -152,23 +143,30 @@ def main():
     
     logging.info("Starting Multi-Company TallyPrime Tests...")
     
-    # Test 1: Connection testing
-    if not test_multi_company_connections():
-        logging.error("Connection test failed. Stopping tests.")
-        return False
-    
-    # Test 2: Aggregated stock items
-    items = test_aggregated_stock_items()
-    if not items:
-        logging.warning("No stock items retrieved")
-    
-    # Test 3: Aggregated movements
-    movements = test_aggregated_movements()
-    if not movements:
-        logging.warning("No stock movements retrieved")
+    # One API instance for all tests so each company connects once and the connection is reused
+    config = load_config()
+    multi_api = MultiCompanyTallyODBCAPI(config['tally']['companies'])
     
-    # Test 4: Export test data
-    export_test_data()
+    try:
+        # Test 1: Connection testing
+        if not test_multi_company_connections(multi_api):
+            logging.error("Connection test failed. Stopping tests.")
+            return False
+        
+        # Test 2: Aggregated stock items
+        items = test_aggregated_stock_items(multi_api)
+        if not items:
+            logging.warning("No stock items retrieved")
+        
+        # Test 3: Aggregated movements
+        movements = test_aggregated_movements(multi_api)
+        if not movements:
+            logging.warning("No stock movements retrieved")
+        
+        # Test 4: Export test data
+        export_test_data(multi_api)
+    finally:
+        multi_api.close_all_connections()
     
     logging.info("=== Multi-Company Tests Complete ===")
     logging.info("If all tests passed, you can now run the full sync with:")
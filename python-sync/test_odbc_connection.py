@@ -6,6 +6,7 @@ Run this script to test your ODBC setup before running the full sync.
 
 import json
 import logging
+import os
 import sys
 from datetime import datetime, timedelta
 from tally_sync import TallyODBCAPI
@@ -43,13 +44,15 @@ def test_odbc_connection():
         if stock_items:
             print(f"✅ Retrieved {len(stock_items)} stock items")
             
-            # Show first few items as sample
-            print("\nSample stock items:")
-            for i, item in enumerate(stock_items[:3]):
-                print(f"  {i+1}. {item['item_name']} - Stock: {item['current_balance']} {item['unit']}")
-            
+            # Show first few items as sample, written to stdout in one call
+            lines = ["\nSample stock items:"]
+            lines.extend(
+                f"  {i+1}. {item['item_name']} - Stock: {item['current_balance']} {item['unit']}"
+                for i, item in enumerate(stock_items[:3])
+            )
             if len(stock_items) > 3:
-                print(f"  ... and {len(stock_items) - 3} more items")
+                lines.append(f"  ... and {len(stock_items) - 3} more items")
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print("❌ No stock items retrieved!")
             print("   Check if your TallyPrime company has stock items.")
@@ -63,13 +66,15 @@ def test_odbc_connection():
         if movements:
             print(f"✅ Retrieved {len(movements)} stock movements (last 30 days)")
             
-            # Show first few movements as sample
-            print("\nSample stock movements:")
-            for i, movement in enumerate(movements[:3]):
-                print(f"  {i+1}. {movement['item_name']} - Qty: {movement['quantity_change']} on {movement['date'][:10]}")
-            
+            # Show first few movements as sample, written to stdout in one call
+            lines = ["\nSample stock movements:"]
+            lines.extend(
+                f"  {i+1}. {movement['item_name']} - Qty: {movement['quantity_change']} on {movement['date'][:10]}"
+                for i, movement in enumerate(movements[:3])
+            )
             if len(movements) > 3:
-                print(f"  ... and {len(movements) - 3} more movements")
+                lines.append(f"  ... and {len(movements) - 3} more movements")
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print("⚠️  No stock movements found in the last 30 days")
             print("   This might be normal if there haven't been recent transactions.")
@@ -81,8 +86,7 @@ def test_odbc_connection():
             print(f"✅ Data exported to {export_file}")
             
             # Show file size
-            import os
-            file_size = os.path.getsize(export_file)
+            file_size = os.stat(export_file).st_size
             print(f"   File size: {file_size:,} bytes")
         else:
             print("❌ JSON export failed!")